@@ -1,10 +1,66 @@
 # create_tables.py
+import asyncio
+from sqlalchemy import text
 from database import engine
 from models import Base
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+# create_all only creates missing tables, so columns added to an existing
+# users table are brought in here. Every statement is safe to re-run.
+UPGRADE_STATEMENTS = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS lat_rad DOUBLE PRECISION"
+    " GENERATED ALWAYS AS (radians(latitude)) STORED",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS lon_rad DOUBLE PRECISION"
+    " GENERATED ALWAYS AS (radians(longitude)) STORED",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS cos_lat DOUBLE PRECISION"
+    " GENERATED ALWAYS AS (cos(radians(latitude))) STORED",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at)",
+    # Rows that predate the column may already have a profile, so they start
+    # at 1; only never-updated accounts (version 0) are answered from claims
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_version INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE users ALTER COLUMN profile_version SET DEFAULT 0",
+]
+
+# interests used to hold a JSON-encoded list in a VARCHAR column, except that
+# an empty list was written as-is and stored as the array literal '{}'. Values
+# that aren't a JSON list become NULL. A subquery isn't allowed in
+# ALTER ... USING, so the conversion goes through a function.
+INTERESTS_FROM_JSON = """
+CREATE FUNCTION pg_temp.interests_from_json(value VARCHAR) RETURNS VARCHAR[]
+LANGUAGE sql IMMUTABLE STRICT AS $$
+    SELECT CASE
+        WHEN value = '{}' THEN '{}'::VARCHAR[]
+        WHEN json_typeof(value::json) = 'array'
+            THEN ARRAY(SELECT json_array_elements_text(value::json))
+    END
+$$
+"""
+
+async def upgrade_interests(conn):
+    data_type = await conn.scalar(text(
+        "SELECT data_type FROM information_schema.columns"
+        " WHERE table_schema = current_schema() AND table_name = 'users'"
+        " AND column_name = 'interests'"
+    ))
+    if data_type != "character varying":
+        return
+    await conn.execute(text(INTERESTS_FROM_JSON))
+    await conn.execute(text(
+        "ALTER TABLE users ALTER COLUMN interests TYPE VARCHAR[]"
+        " USING pg_temp.interests_from_json(NULLIF(NULLIF(interests, ''), 'null'))"
+    ))
+    await conn.execute(text("DROP FUNCTION pg_temp.interests_from_json(VARCHAR)"))
+
+async def upgrade_db(conn):
+    for statement in UPGRADE_STATEMENTS:
+        await conn.execute(text(statement))
+    await upgrade_interests(conn)
+
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await upgrade_db(conn)
 
 if __name__ == "__main__":
-    init_db()
+    asyncio.run(init_db())
     print("Database tables created!")
\ No newline at end of file
@@ -1,14 +1,17 @@
 # database.py
-from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+SQLALCHEMY_DATABASE_URL = make_url(os.getenv("DATABASE_URL"))
+# Plain postgresql:// URLs from .env are served through the asyncpg driver
+if SQLALCHEMY_DATABASE_URL.drivername == "postgresql":
+    SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.set(drivername="postgresql+asyncpg")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
\ No newline at end of file
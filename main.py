@@ -1,23 +1,33 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import ARRAY, Integer, any_, bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional, List
 import jwt
-import json
+from cryptography.hazmat.primitives import serialization
+import asyncio
+import hashlib
+import time
+from cachetools import TTLCache
 from pydantic import BaseModel, EmailStr, confloat, conint, ConfigDict
 from database import SessionLocal, engine
 import models
 from dotenv import load_dotenv
 import os
-from math import radians, sin, cos, sqrt, atan2
+from math import radians, degrees, sin, cos, asin, sqrt, atan2, pi
+import numpy as np
+from numba import njit, prange
+from rtree import index
 
 load_dotenv()
 
-# Initialize FastAPI app
-app = FastAPI()
+# Initialize FastAPI app; orjson encodes responses much faster than json.dumps
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Set up CORS in FastAPI backend to accept mobile requests
 app.add_middleware(
@@ -37,16 +47,55 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 
+# Token keys are parsed once here rather than on every encode/decode. EdDSA signs
+# with the Ed25519 private key PEM in SECRET_KEY and verifies with its public half;
+# HMAC algorithms use the SECRET_KEY bytes for both.
+if ALGORITHM == "EdDSA":
+    _SIGNING_KEY = serialization.load_pem_private_key(SECRET_KEY.encode(), password=None)
+    _VERIFYING_KEY = _SIGNING_KEY.public_key()
+else:
+    _SIGNING_KEY = _VERIFYING_KEY = SECRET_KEY.encode()
+_ALGORITHMS = [ALGORITHM]
+_jwt = jwt.PyJWT()
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Decoded token claims keyed by SHA-256 of the raw token.
+# Entries are also checked against exp, so a hit never outlives the token.
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+# Resolved User rows keyed by id; dropped on profile updates. Other workers'
+# updates can go unseen for this long, and /users/me only answers from token
+# claims within the same window after login.
+USER_CACHE_TTL = 60
+_user_cache = TTLCache(maxsize=5000, ttl=USER_CACHE_TTL)
+# Latest profile_version per user whose profile changed in this worker. Tokens
+# carrying an older "pv" claim can't be used to answer /users/me from claims.
+_profile_versions = TTLCache(maxsize=10000, ttl=USER_CACHE_TTL)
+# What /users/me returns for the fields a new account hasn't set yet
+_NEW_PROFILE_DEFAULTS = {
+    column: models.User.__table__.c[column].default.arg
+    for column in ("max_distance", "preferred_age_range_min", "preferred_age_range_max")
+}
+
+# Per-worker spatial index for /users/nearby; changes from other workers are
+# pulled in on this interval
+USER_INDEX_TTL = 60
+
+# Login attempts per (client IP, email), reset on success; once the limit is hit,
+# further attempts are refused until the window passes
+MAX_FAILED_LOGINS = 5
+_failed_logins = TTLCache(maxsize=10000, ttl=300)
+
 # Pydantic models for request/response
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
     full_name: str
 
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
 class User(BaseModel):
     email: EmailStr
     full_name: str
@@ -60,29 +109,26 @@ class User(BaseModel):
     age: Optional[int] = None
     gender: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True) 
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
 class Token(BaseModel):
     access_token: str
     token_type: str
 
 class ProfileUpdate(BaseModel):
-    latitude: Optional[confloat(ge=-90, le=90)]
-    longitude: Optional[confloat(ge=-180, le=180)]
-    interests: Optional[List[str]]
-    max_distance: Optional[confloat(ge=0, le=100)]
-    preferred_age_range_min: Optional[conint(ge=18)]
-    preferred_age_range_max: Optional[conint(ge=18)]
-    age: Optional[conint(ge=18)]
-    gender: Optional[str]
+    latitude: Optional[confloat(ge=-90, le=90)] = None
+    longitude: Optional[confloat(ge=-180, le=180)] = None
+    interests: Optional[List[str]] = None
+    max_distance: Optional[confloat(ge=0, le=100)] = None
+    preferred_age_range_min: Optional[conint(ge=18)] = None
+    preferred_age_range_max: Optional[conint(ge=18)] = None
+    age: Optional[conint(ge=18)] = None
+    gender: Optional[str] = None
 
 # Database dependency
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Helper functions
 def verify_password(plain_password, hashed_password):
@@ -92,137 +138,405 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # "iat" and "exp" are plain epoch seconds, so skip building datetimes
+    now = time.time()
+    lifetime = expires_delta.total_seconds() if expires_delta else 900
+    to_encode = {**data, "iat": int(now), "exp": int(now + lifetime)}
+    encoded_jwt = _jwt.encode(to_encode, _SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate distance between two points in kilometers using Haversine formula"""
-    R = 6371  # Earth's radius in kilometers
+@njit(cache=True, fastmath=True)
+def _haversine(lat1, lon1, lat2, lon2):
+    R = 6371.0  # Earth's radius in kilometers
 
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    lat1, lon1, lat2, lon2 = radians(lat1), radians(lon1), radians(lat2), radians(lon2)
     dlat = lat2 - lat1
     dlon = lon2 - lon1
 
     a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
     c = 2 * atan2(sqrt(a), sqrt(1-a))
-    distance = R * c
 
-    return distance
+    return R * c
+
+# Compile at import so the first request doesn't pay for JIT
+_haversine(0.0, 0.0, 0.0, 0.0)
+
+def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calculate distance between two points in kilometers using Haversine formula"""
+    return _haversine(float(lat1), float(lon1), float(lat2), float(lon2))
+
+@njit(parallel=True, fastmath=True, cache=True)
+def haversine_batch(lat1, lon1, cos_lat1, lats, lons, cos_lats, max_distance, out):
+    """Fill `out` with distances in kilometers from one point to arrays of points.
+
+    Coordinates are in radians, with cos(latitude) precomputed for every point.
+    Points clearly nearer or farther than `max_distance` get a cheap
+    equirectangular estimate; exact Haversine only runs within 3% of it.
+    """
+    R = 6371.0  # Earth's radius in kilometers
+    accept = 0.97 * max_distance
+    reject = 1.03 * max_distance
+
+    for i in prange(lats.shape[0]):
+        dlat = lats[i] - lat1
+        dlon = lons[i] - lon1
+        if dlon > pi:
+            dlon -= 2 * pi
+        elif dlon < -pi:
+            dlon += 2 * pi
+
+        # Equirectangular error stays well under 1% for spans up to 0.2 rad
+        if abs(dlat) <= 0.2 and abs(dlon) <= 0.2:
+            x = dlon * 0.5 * (cos_lat1 + cos_lats[i])
+            d = R * sqrt(x*x + dlat*dlat)
+            if d <= accept or d > reject:
+                out[i] = d
+                continue
+
+        a = sin(dlat/2)**2 + cos_lat1 * cos_lats[i] * sin(dlon/2)**2
+        out[i] = R * 2 * atan2(sqrt(a), sqrt(1-a))
+
+# Compile at import so the first request doesn't pay for JIT
+haversine_batch(0.0, 0.0, 1.0, np.zeros(1), np.zeros(1), np.ones(1), 10.0, np.empty(1))
+
+def bounding_box(lat: float, lon: float, distance: float):
+    """Return (min_lat, max_lat, lon_ranges) enclosing a radius of `distance` km.
+
+    lon_ranges is a list of (min_lon, max_lon) pairs in [-180, 180]; a box that
+    crosses the antimeridian is split in two.
+    """
+    r = distance / 6371  # angular radius on a sphere of Earth's radius
+    dlat = degrees(r)
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    # If the circle reaches a pole, every longitude is in range
+    if min_lat <= -90.0 or max_lat >= 90.0 or sin(r) >= cos(radians(lat)):
+        return min_lat, max_lat, [(-180.0, 180.0)]
+
+    dlon = degrees(asin(sin(r) / cos(radians(lat))))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180.0:
+        return min_lat, max_lat, [(min_lon + 360.0, 180.0), (-180.0, max_lon)]
+    if max_lon > 180.0:
+        return min_lat, max_lat, [(min_lon, 180.0), (-180.0, max_lon - 360.0)]
+    return min_lat, max_lat, [(min_lon, max_lon)]
+
+class UserLocationIndex:
+    """In-memory R-tree of user locations for the nearby-user lookup.
+
+    The tree is bulk-loaded once and then kept current incrementally: this
+    worker's profile updates are applied as they happen, and every `ttl` seconds
+    rows whose updated_at moved since the last sync are read back, which picks
+    up locations changed by other workers.
+    """
+
+    # Re-read a little before the last sync so rows from transactions that
+    # started earlier but committed after it aren't missed
+    SYNC_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._tree = index.Index()
+        self._points = {}  # user id -> (longitude, latitude) as stored in the tree
+        self._synced_at = None  # database time the tree is current as of
+        self._checked_at = None  # monotonic time of the last load or sync
+        self._pending = None  # updates made while a load or sync is awaiting the database
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self):
+        return self._checked_at is not None and time.monotonic() - self._checked_at < self.ttl
+
+    async def refresh(self, db: AsyncSession):
+        if self._is_fresh():
+            return
+        # Once loaded, requests use the current tree rather than queue behind a sync
+        if self._synced_at is not None and self._lock.locked():
+            return
+        async with self._lock:
+            if self._is_fresh():
+                return
+            self._pending = []
+            try:
+                if self._synced_at is None:
+                    await self._load(db)
+                else:
+                    await self._sync(db)
+            finally:
+                pending, self._pending = self._pending, None
+            # Updates made meanwhile are newer than what the database read returned
+            for user_id, lat, lon in pending:
+                self._apply(user_id, lat, lon)
+            self._checked_at = time.monotonic()
+
+    async def _load(self, db: AsyncSession):
+        synced_at = await db.scalar(select(func.now()))
+        rows = (await db.execute(
+            select(models.User.id, models.User.longitude, models.User.latitude).where(
+                models.User.latitude.isnot(None),
+                models.User.longitude.isnot(None)
+            )
+        )).all()
+        points = {row.id: (row.longitude, row.latitude) for row in rows}
+        # Bulk-loading a large table takes seconds; keep it off the event loop
+        tree = await run_in_threadpool(self._build_tree, points)
+        self._tree, self._points, self._synced_at = tree, points, synced_at
+
+    async def _sync(self, db: AsyncSession):
+        synced_at = await db.scalar(select(func.now()))
+        rows = (await db.execute(
+            select(models.User.id, models.User.longitude, models.User.latitude).where(
+                models.User.updated_at > self._synced_at - self.SYNC_OVERLAP
+            )
+        )).all()
+        for row in rows:
+            self._apply(row.id, row.latitude, row.longitude)
+        self._synced_at = synced_at
+
+    @staticmethod
+    def _build_tree(points):
+        # rtree can't stream-load an empty index
+        if not points:
+            return index.Index()
+        return index.Index(
+            (user_id, (lon, lat, lon, lat), None) for user_id, (lon, lat) in points.items()
+        )
+
+    def update(self, user_id: int, lat: Optional[float], lon: Optional[float]):
+        if self._pending is not None:
+            self._pending.append((user_id, lat, lon))
+        self._apply(user_id, lat, lon)
+
+    def _apply(self, user_id: int, lat: Optional[float], lon: Optional[float]):
+        old = self._points.pop(user_id, None)
+        if old is not None:
+            self._tree.delete(user_id, (*old, *old))
+        if lat is not None and lon is not None:
+            self._tree.insert(user_id, (lon, lat, lon, lat))
+            self._points[user_id] = (lon, lat)
+
+    def intersection(self, min_lat: float, max_lat: float, lon_ranges):
+        # A point on the antimeridian can fall in both halves of a split box
+        return list(dict.fromkeys(
+            user_id
+            for min_lon, max_lon in lon_ranges
+            for user_id in self._tree.intersection((min_lon, min_lat, max_lon, max_lat))
+        ))
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+_user_index = UserLocationIndex(ttl=USER_INDEX_TTL)
+
+def decode_token(token: str) -> Optional[dict]:
+    """Return the token's claims, or None if it is invalid or expired"""
+    token_key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(token_key)
+    if payload is not None and payload["exp"] > time.time():
+        return payload
+    try:
+        payload = _jwt.decode(
+            token, _VERIFYING_KEY, algorithms=_ALGORITHMS, options={"require": ["exp", "sub"]}
+        )
+    except jwt.PyJWTError:
+        return None
+    _token_cache[token_key] = payload
+    return payload
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except jwt.JWTError:
+    payload = decode_token(token)
+    if payload is None:
         raise credentials_exception
-    
-    user = get_user(db, email)
+
+    user = _user_cache.get(payload.get("uid"))
     if user is None:
-        raise credentials_exception
+        user = await get_user(db, payload["sub"])
+        if user is None:
+            raise credentials_exception
+        _user_cache[user.id] = user
     return user
 
 # User operations
-def get_user(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+def user_id_in(ids: List[int]):
+    """`users.id = ANY($1::int[])` with the ids bound as a single array parameter.
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = get_user(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+    Unlike an expanding IN list, the SQL text is the same for any number of ids,
+    so asyncpg reuses one prepared statement.
+    """
+    return models.User.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+
+async def get_user(db: AsyncSession, email: str):
+    return await db.scalar(select(models.User).where(models.User.email == email))
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await get_user(db, email)
+    if not user:
+        return False
+    # bcrypt takes a few hundred ms; keep it off the event loop
+    if not await run_in_threadpool(verify_password, password, user.hashed_password):
         return False
     return user
 
 # Endpoints
 @app.post("/register", response_model=User)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = get_user(db, user.email)
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await get_user(db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
     db_user = models.User(
         email=user.email,
         hashed_password=hashed_password,
         full_name=user.full_name
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @app.post("/token", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    attempt_key = (request.client.host if request.client else None, form_data.username)
+    attempts = _failed_logins.get(attempt_key, 0)
+    if attempts >= MAX_FAILED_LOGINS:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+        )
+    # Count the attempt before bcrypt runs so concurrent requests can't all pass the check
+    _failed_logins[attempt_key] = attempts + 1
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    _failed_logins.pop(attempt_key, None)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "pv": user.profile_version,
+            "full_name": user.full_name,
+            "is_active": user.is_active,
+        },
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/users/me", response_model=User)
-async def read_users_me(current_user: models.User = Depends(get_current_user)):
-    return current_user
+async def read_users_me(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    # Tokens only carry non-sensitive claims. A profile that has never been
+    # updated (version 0) holds nothing beyond them and the column defaults,
+    # so it can be answered without the database; anything else is loaded.
+    # Another worker may have updated the profile since login, so the claims
+    # are only trusted for as long as _user_cache entries are.
+    payload = decode_token(token)
+    if (
+        payload is not None
+        and payload.get("pv") == 0
+        and "full_name" in payload
+        and time.time() - payload.get("iat", 0) < USER_CACHE_TTL
+    ):
+        if _profile_versions.get(payload["uid"], 0) == 0:
+            return {
+                "email": payload["sub"],
+                "full_name": payload["full_name"],
+                "is_active": payload["is_active"],
+                **_NEW_PROFILE_DEFAULTS,
+            }
+    return await get_current_user(token, db)
 
 @app.put("/users/profile", response_model=User)
 async def update_profile(
     profile: ProfileUpdate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user_data = profile.dict(exclude_unset=True)
-    if user_data.get("interests"):
-        user_data["interests"] = json.dumps(user_data["interests"])
-    
-    db_user = db.query(models.User).filter(models.User.id == current_user.id)
-    db_user.update(user_data)
-    db.commit()
+    user_data = profile.model_dump(exclude_unset=True)
+
+    # UPDATE ... RETURNING gives back the new row without a follow-up SELECT
+    stmt = (
+        update(models.User)
+        .where(models.User.id == current_user.id)
+        .values(
+            **user_data,
+            profile_version=models.User.profile_version + 1,
+            updated_at=func.now()
+        )
+        .returning(models.User)
+    )
+    db_user = (await db.execute(stmt)).scalar_one()
+    await db.commit()
+    _user_cache.pop(current_user.id, None)
+    _profile_versions[db_user.id] = db_user.profile_version
+    _user_index.update(db_user.id, db_user.latitude, db_user.longitude)
     
-    return db_user.first()
+    return db_user
 
 @app.get("/users/nearby", response_model=List[User])
 async def get_nearby_users(
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if not current_user.latitude or not current_user.longitude:
         raise HTTPException(status_code=400, detail="User location not set")
 
-    max_distance = current_user.max_distance or 10  # Default to 10km if not set
+    max_distance = float(current_user.max_distance or 10.0)  # Default to 10km if not set
     
-    # Get all users except current user
-    all_users = db.query(models.User).filter(
-        models.User.id != current_user.id,
-        models.User.latitude.isnot(None),
-        models.User.longitude.isnot(None)
-    ).all()
-    
-    # Filter users by distance
-    nearby_users = [
-        user for user in all_users
-        if calculate_distance(
-            current_user.latitude,
-            current_user.longitude,
-            user.latitude,
-            user.longitude
-        ) <= max_distance
+    # Only pull users inside the bounding box; exact distance is checked below
+    min_lat, max_lat, lon_ranges = bounding_box(
+        current_user.latitude, current_user.longitude, max_distance
+    )
+    await _user_index.refresh(db)
+    candidate_ids = [
+        user_id for user_id in _user_index.intersection(min_lat, max_lat, lon_ranges)
+        if user_id != current_user.id
     ]
+    if not candidate_ids:
+        return []
+
+    # The index can lag other workers, so distances use the stored locations.
+    # Only the columns the distance check needs; full rows are loaded for survivors
+    candidates = (await db.execute(
+        select(
+            models.User.id, models.User.lat_rad, models.User.lon_rad, models.User.cos_lat
+        ).where(
+            user_id_in(candidate_ids),
+            models.User.latitude.isnot(None),
+            models.User.longitude.isnot(None)
+        )
+    )).all()
+    
+    if not candidates:
+        return []
+
+    # Filter users by distance in one compiled pass
+    count = len(candidates)
+    ids = np.fromiter((c.id for c in candidates), dtype=np.int64, count=count)
+    lats = np.fromiter((c.lat_rad for c in candidates), dtype=np.float64, count=count)
+    lons = np.fromiter((c.lon_rad for c in candidates), dtype=np.float64, count=count)
+    cos_lats = np.fromiter((c.cos_lat for c in candidates), dtype=np.float64, count=count)
+    distances = np.empty(count)
+    haversine_batch(
+        current_user.lat_rad, current_user.lon_rad, current_user.cos_lat,
+        lats, lons, cos_lats, max_distance, distances
+    )
+    nearby_ids = ids[np.nonzero(distances <= max_distance)[0]].tolist()
+    if not nearby_ids:
+        return []
+
+    # Hydrate every survivor in one query; expire_on_commit=False keeps attribute
+    # access during response serialization from triggering per-row refreshes
+    nearby_users = (await db.scalars(
+        select(models.User).where(user_id_in(nearby_ids))
+    )).all()
     
     return nearby_users
\ No newline at end of file
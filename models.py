@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, Table
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Table, Computed, ARRAY, func
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -13,9 +13,17 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     latitude = Column(Float)
     longitude = Column(Float)
-    interests = Column(String)  # Store as JSON string
+    # Derived from latitude/longitude by the database; used by the distance check
+    lat_rad = Column(Float, Computed("radians(latitude)"))
+    lon_rad = Column(Float, Computed("radians(longitude)"))
+    cos_lat = Column(Float, Computed("cos(radians(latitude))"))
+    interests = Column(ARRAY(String))
     max_distance = Column(Float, default=10.0)  # in kilometers
     preferred_age_range_min = Column(Integer, default=18)
     preferred_age_range_max = Column(Integer, default=100)
     age = Column(Integer)
-    gender = Column(String)
\ No newline at end of file
+    gender = Column(String)
+    # Bumped on every profile update so tokens minted earlier can be spotted as stale
+    profile_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Set on every profile update; workers use it to sync their location index
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)